@@ -1,17 +1,37 @@
 from fastapi import FastAPI, APIRouter, HTTPException
+from fastapi.responses import ORJSONResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
 import os
 import logging
 from pathlib import Path
-from pydantic import BaseModel, Field
-from typing import List, Optional
+from pydantic import BaseModel, Field, model_validator
+from typing import List, Optional, Tuple, Type
 import uuid
+import asyncio
+import hashlib
+import sqlite3
+import threading
 from datetime import datetime
+from functools import lru_cache
 import numpy as np
+from bson import Binary
+from pymongo.errors import WriteError
 from sentence_transformers import SentenceTransformer
 
+try:
+    import faiss
+except ImportError:
+    faiss = None
+
+try:
+    import numba
+    # Kernels launch from worker threads; TBB can hang interpreter shutdown in that case
+    numba.config.THREADING_LAYER_PRIORITY = ['omp', 'tbb', 'workqueue']
+except ImportError:
+    numba = None
+
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
@@ -21,15 +41,51 @@ mongo_url = os.environ['MONGO_URL']
 client = AsyncIOMotorClient(mongo_url)
 db = client[os.environ['DB_NAME']]
 
-# Initialize local embedding model (no API key needed!)
-# Using all-MiniLM-L6-v2 - fast, efficient, 384 dimensions
-logger_temp = logging.getLogger(__name__)
-logger_temp.info("Loading embedding model...")
-embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
-logger_temp.info("Embedding model loaded successfully")
-
-# Create the main app without a prefix
-app = FastAPI(title="Syntra API", description="Personal Knowledge Operating System")
+# Name of an Atlas Vector Search index on knowledge_nodes.embedding. When set,
+# similarity queries run server-side with $vectorSearch instead of in-process.
+# Index definition:
+#   {"fields": [{"type": "vector", "path": "embedding",
+#                "numDimensions": 384, "similarity": "cosine"}]}
+VECTOR_SEARCH_INDEX = os.environ.get('VECTOR_SEARCH_INDEX')
+
+# Local embedding model (no API key needed!)
+# Using all-MiniLM-L6-v2 - fast, efficient, 384 dimensions.
+# Loaded once on first use (warmed at startup) and shared by all requests.
+EMBEDDING_MODEL = 'all-MiniLM-L6-v2'
+EMBEDDING_DIM = 384
+_embedding_model: Optional[SentenceTransformer] = None
+_embedding_model_lock = threading.Lock()
+
+def get_embedding_model() -> SentenceTransformer:
+    """Return the shared embedding model, loading it on first call."""
+    global _embedding_model
+    if _embedding_model is None:
+        with _embedding_model_lock:
+            if _embedding_model is None:
+                logger.info("Loading embedding model...")
+                model = SentenceTransformer(EMBEDDING_MODEL)
+                if model.get_sentence_embedding_dimension() != EMBEDDING_DIM:
+                    raise RuntimeError(f"{EMBEDDING_MODEL} does not produce {EMBEDDING_DIM}-dimensional embeddings")
+                _embedding_model = model
+                logger.info("Embedding model loaded successfully")
+    return _embedding_model
+
+# On-disk embedding cache keyed by content hash, so identical text is never re-encoded.
+# The connection is opened on app startup and closed on shutdown.
+EMBEDDING_CACHE_PATH = Path(os.environ.get('EMBEDDING_CACHE_PATH', ROOT_DIR / 'embedding_cache.sqlite3'))
+# Oldest entries are evicted past this many rows
+EMBEDDING_CACHE_MAX_ENTRIES = int(os.environ.get('EMBEDDING_CACHE_MAX_ENTRIES', 50000))
+# Stay well under SQLite's host-parameter limit (999 on older builds)
+EMBEDDING_CACHE_QUERY_CHUNK = 500
+embedding_cache: Optional[sqlite3.Connection] = None
+embedding_cache_lock = threading.Lock()
+
+# Create the main app without a prefix; orjson encodes float-heavy responses much faster
+app = FastAPI(
+    title="Syntra API",
+    description="Personal Knowledge Operating System",
+    default_response_class=ORJSONResponse
+)
 
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
@@ -43,6 +99,40 @@ logger = logging.getLogger(__name__)
 
 # Constants
 SIMILARITY_THRESHOLD = 0.75
+VECTOR_SEARCH_MATCH_LIMIT = 50
+
+# Projections for responses that never show embeddings (or content)
+NODE_PREVIEW_PROJECTION = {"_id": 0, "embedding": 0, "embeddingScale": 0}
+NODE_SUMMARY_PROJECTION = {"_id": 0, "content": 0, "embedding": 0, "embeddingScale": 0}
+
+# Embeddings are stored as BSON vectors: binary subtype 9 with a two-byte
+# header (dtype, padding 0) followed by the packed elements. New nodes are
+# stored as int8 with a per-vector float32 scale in `embeddingScale`;
+# float32 vectors written before quantization are still readable.
+BSON_VECTOR_SUBTYPE = 9
+BSON_VECTOR_INT8 = 0x03
+BSON_VECTOR_FLOAT32 = 0x27
+
+# ================================
+# Embedding Storage
+# ================================
+
+def encode_embedding(embedding: List[float]) -> Tuple[Binary, float]:
+    """Quantize an embedding to a BSON int8 vector, returning it with its dequantization scale."""
+    vec = np.asarray(embedding, dtype=np.float32)
+    peak = float(np.abs(vec).max()) if vec.size else 0.0
+    scale = peak / 127 if peak > 0 else 1.0
+    quantized = np.clip(np.round(vec / scale), -127, 127).astype(np.int8)
+    return Binary(bytes([BSON_VECTOR_INT8, 0]) + quantized.tobytes(), BSON_VECTOR_SUBTYPE), scale
+
+def decode_embedding(value, scale: Optional[float] = None) -> np.ndarray:
+    """Unpack a stored embedding (BSON vector or legacy list of floats) into float32."""
+    if isinstance(value, bytes):
+        if value[0] == BSON_VECTOR_INT8:
+            quantized = np.frombuffer(value, dtype=np.int8, offset=2)
+            return quantized.astype(np.float32) * np.float32(scale or 1.0)
+        return np.frombuffer(value, dtype='<f4', offset=2)
+    return np.asarray(value or [], dtype=np.float32)
 
 # ================================
 # Pydantic Models
@@ -65,6 +155,30 @@ class KnowledgeNode(BaseModel):
     embedding: List[float] = []
     createdAt: datetime = Field(default_factory=datetime.utcnow)
 
+    @model_validator(mode='before')
+    @classmethod
+    def unpack_embedding(cls, data):
+        if isinstance(data, dict) and 'embedding' in data:
+            data = dict(data)
+            scale = data.pop('embeddingScale', None)
+            # Lists (including re-validated responses) are already decoded
+            if isinstance(data['embedding'], bytes):
+                data['embedding'] = decode_embedding(data['embedding'], scale).tolist()
+        return data
+
+class KnowledgeNodeSummary(BaseModel):
+    """A node without its content or embedding, enough to draw it in the graph."""
+    id: str
+    type: str
+    title: str
+    source: Optional[str] = None
+    tags: List[str] = []
+    createdAt: datetime
+
+class KnowledgeNodePreview(KnowledgeNodeSummary):
+    """A node with its content but without its embedding, for connection lists."""
+    content: str
+
 class Connection(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     fromNodeId: str
@@ -80,11 +194,11 @@ class SearchResult(BaseModel):
     similarity: float
 
 class GraphData(BaseModel):
-    nodes: List[KnowledgeNode]
+    nodes: List[KnowledgeNodeSummary]
     connections: List[Connection]
 
 class ConnectedNode(BaseModel):
-    node: KnowledgeNode
+    node: KnowledgeNodePreview
     similarityScore: float
 
 class NodeWithConnections(BaseModel):
@@ -95,36 +209,253 @@ class NodeWithConnections(BaseModel):
 # Helper Functions
 # ================================
 
-def generate_embedding(content: str) -> List[float]:
-    """Generate embedding for text content using local sentence-transformers model."""
+def hydrate(model: Type[BaseModel], doc: dict) -> BaseModel:
+    """Build a model from a stored document, skipping validation of trusted data."""
+    return model.model_construct(**{k: v for k, v in doc.items() if k in model.model_fields})
+
+def hydrate_node(doc: dict) -> KnowledgeNode:
+    """Build a KnowledgeNode from a stored document, skipping validation of trusted data."""
+    fields = {k: v for k, v in doc.items() if k in KnowledgeNode.model_fields}
+    if 'embedding' in fields:
+        fields['embedding'] = decode_embedding(fields['embedding'], doc.get('embeddingScale')).tolist()
+    return KnowledgeNode.model_construct(**fields)
+
+def embedding_cache_key(text: str) -> str:
+    """Cache key for a cleaned text under the current embedding model."""
+    return hashlib.sha256((EMBEDDING_MODEL + "\0" + text).encode()).hexdigest()
+
+def _read_embedding_cache(keys: List[str]) -> dict:
+    """Look up cached vectors for the given keys, chunked to respect SQLite's parameter limit."""
+    vectors = {}
+    with embedding_cache_lock:
+        for i in range(0, len(keys), EMBEDDING_CACHE_QUERY_CHUNK):
+            chunk = keys[i:i + EMBEDDING_CACHE_QUERY_CHUNK]
+            rows = embedding_cache.execute(
+                f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(chunk))})",
+                chunk
+            ).fetchall()
+            vectors.update((key, np.frombuffer(blob, dtype=np.float32)) for key, blob in rows)
+    return vectors
+
+def _write_embedding_cache(vectors: dict):
+    """Store new vectors, then evict the oldest entries beyond EMBEDDING_CACHE_MAX_ENTRIES."""
+    with embedding_cache_lock, embedding_cache:
+        embedding_cache.executemany(
+            "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+            [(key, vec.tobytes()) for key, vec in vectors.items()]
+        )
+        embedding_cache.execute(
+            "DELETE FROM embeddings WHERE rowid <= "
+            "(SELECT rowid FROM embeddings ORDER BY rowid DESC LIMIT 1 OFFSET ?)",
+            (EMBEDDING_CACHE_MAX_ENTRIES,)
+        )
+
+def _generate_embeddings_batch(contents: List[str], persist: bool = True) -> List[List[float]]:
+    """Generate embeddings for many texts, encoding only cache misses in a single model call.
+    
+    With persist=False cache hits are still used but new vectors are not written to disk.
+    """
     try:
-        text_clean = content.replace("\n", " ").strip()
-        if not text_clean:
-            return []
+        texts = [content.replace("\n", " ").strip() for content in contents]
+        keys = [embedding_cache_key(text) for text in texts]
+        vectors = _read_embedding_cache(list({key for key, text in zip(keys, texts) if text}))
         
-        # Use local sentence-transformers model (no API key needed!)
-        embedding = embedding_model.encode(text_clean, convert_to_numpy=True)
-        return embedding.tolist()
+        misses = {key: text for key, text in zip(keys, texts) if text and key not in vectors}
+        if misses:
+            # Use local sentence-transformers model (no API key needed!). Vectors come back
+            # unit-length, so cosine similarity downstream is a plain dot product.
+            encoded = get_embedding_model().encode(list(misses.values()), convert_to_numpy=True, normalize_embeddings=True)
+            new_vectors = dict(zip(misses, encoded.astype(np.float32)))
+            if persist:
+                _write_embedding_cache(new_vectors)
+            vectors.update(new_vectors)
+        
+        return [vectors[key].tolist() if text else [] for key, text in zip(keys, texts)]
     except Exception as e:
         logger.error(f"Error generating embedding: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to generate embedding: {str(e)}")
 
-def cosine_similarity(vec_a: List[float], vec_b: List[float]) -> float:
-    """Calculate cosine similarity between two vectors."""
-    if not vec_a or not vec_b:
-        return 0.0
+async def generate_embeddings_batch(contents: List[str]) -> List[List[float]]:
+    """Generate embeddings for many texts in a worker thread so encoding never blocks the event loop."""
+    return await asyncio.to_thread(_generate_embeddings_batch, contents)
+
+async def generate_embedding(content: str) -> List[float]:
+    """Generate embedding for text content using local sentence-transformers model."""
+    return (await generate_embeddings_batch([content]))[0]
+
+@lru_cache(maxsize=4096)
+def _cached_query_embedding(model: str, query: str) -> Tuple[float, ...]:
+    # Queries are memoized here only; they never grow the on-disk cache
+    return tuple(_generate_embeddings_batch([query], persist=False)[0])
+
+async def generate_query_embedding(query: str) -> List[float]:
+    """Generate embedding for a search query, memoized in process since queries repeat."""
+    return list(await asyncio.to_thread(_cached_query_embedding, EMBEDDING_MODEL, query))
+
+# ================================
+# In-process Embedding Index
+# ================================
+
+# Unit-length embeddings of every node, one row per id in _EMB_IDS.
+# Search and connection discovery score against these rows instead of
+# re-reading all embeddings from MongoDB on every request. With FAISS
+# installed the rows live in an IndexFlatIP (inner product of unit
+# vectors == cosine similarity); otherwise in a plain NumPy matrix.
+_EMB_MATRIX: np.ndarray = np.empty((0, EMBEDDING_DIM), dtype=np.float32)
+_EMB_INDEX = faiss.IndexFlatIP(EMBEDDING_DIM) if faiss else None
+_EMB_IDS: List[str] = []
+_EMB_LOCK = asyncio.Lock()
+
+async def load_embedding_index():
+    """Build the in-process embedding index from all stored nodes."""
+    global _EMB_MATRIX, _EMB_INDEX, _EMB_IDS
+    if VECTOR_SEARCH_INDEX:
+        logger.info(f"Using Atlas Vector Search index '{VECTOR_SEARCH_INDEX}'")
+        return
+    
+    ids = []
+    rows = []
+    # Only id and embedding are needed to score; full documents are fetched per match
+    async for node in db.knowledge_nodes.find({}, {"_id": 0, "id": 1, "embedding": 1, "embeddingScale": 1}):
+        embedding = decode_embedding(node.get('embedding'), node.get('embeddingScale'))
+        if embedding.size == EMBEDDING_DIM:
+            ids.append(node['id'])
+            rows.append(embedding)
+    matrix = np.vstack(rows) if rows else np.empty((0, EMBEDDING_DIM), dtype=np.float32)
+    
+    # Renormalize once here so rows written by older versions (or rounded by int8
+    # quantization) are exactly unit-length; queries never compute norms.
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    matrix = matrix / np.where(norms > 0, norms, 1.0)
+    
+    async with _EMB_LOCK:
+        if faiss:
+            _EMB_INDEX = faiss.IndexFlatIP(EMBEDDING_DIM)
+            _EMB_INDEX.add(matrix)
+        else:
+            _EMB_MATRIX = matrix
+        _EMB_IDS = ids
+    logger.info(f"Embedding index loaded with {len(ids)} nodes ({'faiss' if faiss else 'numpy'})")
+
+def add_to_embedding_index(node_id: str, embedding: List[float]):
+    """Append a node's (unit-length) embedding to the index."""
+    global _EMB_MATRIX, _EMB_IDS
+    if not embedding or VECTOR_SEARCH_INDEX:
+        return
+    row = np.asarray(embedding, dtype=np.float32)[None, :]
+    if _EMB_INDEX is not None:
+        _EMB_INDEX.add(row)
+    else:
+        _EMB_MATRIX = np.vstack([_EMB_MATRIX, row])
+    _EMB_IDS = _EMB_IDS + [node_id]
+
+def remove_from_embedding_index(node_id: str):
+    """Drop a node's row from the index if present."""
+    global _EMB_MATRIX, _EMB_IDS
+    if node_id not in _EMB_IDS:
+        return
+    idx = _EMB_IDS.index(node_id)
+    if _EMB_INDEX is not None:
+        # IndexFlat compacts in order, so positions stay aligned with _EMB_IDS
+        _EMB_INDEX.remove_ids(np.array([idx], dtype=np.int64))
+    else:
+        _EMB_MATRIX = np.delete(_EMB_MATRIX, idx, axis=0)
+    _EMB_IDS = _EMB_IDS[:idx] + _EMB_IDS[idx + 1:]
+
+if numba is not None:
+    @numba.njit(parallel=True, fastmath=True, cache=True)
+    def _dot_rows(matrix, query, out):
+        """Dot product of every (pre-normalized) row with the query, in parallel over rows."""
+        for i in numba.prange(matrix.shape[0]):
+            total = np.float32(0.0)
+            for k in range(matrix.shape[1]):
+                total += matrix[i, k] * query[k]
+            out[i] = total
+    
+    # The workqueue threading layer does not allow concurrent kernel launches
+    _dot_rows_lock = threading.Lock()
+    
+    def _score_rows(matrix: np.ndarray, query: np.ndarray, out: np.ndarray):
+        with _dot_rows_lock:
+            _dot_rows(matrix, query, out)
+
+async def score_embedding_matrix(query: np.ndarray) -> Tuple[List[str], np.ndarray]:
+    """Score a unit-length query against the NumPy matrix, returning ids aligned with the scores."""
+    # Rows are replaced, never mutated in place, so this pair is a consistent snapshot
+    ids, matrix = _EMB_IDS, _EMB_MATRIX
+    if numba is None:
+        return ids, matrix @ query
+    
+    # Run the JIT kernel in a worker thread so it never blocks the event loop
+    out = np.empty(len(ids), dtype=np.float32)
+    await asyncio.to_thread(_score_rows, matrix, query, out)
+    return ids, out
+
+async def search_embedding_index(embedding: List[float], k: int) -> List[Tuple[str, float]]:
+    """Return the k most similar indexed nodes as (id, similarity), best first."""
+    if not embedding or not _EMB_IDS:
+        return []
+    query = np.asarray(embedding, dtype=np.float32)
+    k = min(k, len(_EMB_IDS))
     
-    a = np.array(vec_a)
-    b = np.array(vec_b)
+    if _EMB_INDEX is not None:
+        scores, idxs = _EMB_INDEX.search(query[None, :], k)
+        return [(_EMB_IDS[i], float(score)) for score, i in zip(scores[0], idxs[0]) if i >= 0]
     
-    dot_product = np.dot(a, b)
-    norm_a = np.linalg.norm(a)
-    norm_b = np.linalg.norm(b)
+    ids, similarities = await score_embedding_matrix(query)
+    top = np.argpartition(-similarities, k - 1)[:k]
+    top = top[np.argsort(-similarities[top])]
+    return [(ids[i], float(similarities[i])) for i in top]
+
+async def match_embedding_index(embedding: List[float], threshold: float) -> List[Tuple[str, float]]:
+    """Return every indexed node with similarity >= threshold as (id, similarity)."""
+    if not embedding or not _EMB_IDS:
+        return []
+    query = np.asarray(embedding, dtype=np.float32)
     
-    if norm_a == 0 or norm_b == 0:
-        return 0.0
+    if _EMB_INDEX is not None:
+        # range_search keeps scores strictly above the radius
+        radius = float(np.nextafter(np.float32(threshold), np.float32(-1.0)))
+        _, scores, idxs = _EMB_INDEX.range_search(query[None, :], radius)
+        return [(_EMB_IDS[i], float(score)) for score, i in zip(scores, idxs) if score >= threshold]
     
-    return float(dot_product / (norm_a * norm_b))
+    ids, similarities = await score_embedding_matrix(query)
+    return [(ids[i], float(similarities[i])) for i in np.flatnonzero(similarities >= threshold)]
+
+# ================================
+# Similarity Queries
+# ================================
+
+async def vector_search(embedding: List[float], limit: int) -> List[Tuple[str, float]]:
+    """Run an Atlas $vectorSearch and return (id, cosine similarity) pairs, best first."""
+    if not embedding:
+        return []
+    pipeline = [
+        {"$vectorSearch": {
+            "index": VECTOR_SEARCH_INDEX,
+            "path": "embedding",
+            "queryVector": embedding,
+            "numCandidates": limit * 10,
+            "limit": limit
+        }},
+        {"$project": {"_id": 0, "id": 1, "score": {"$meta": "vectorSearchScore"}}}
+    ]
+    results = await db.knowledge_nodes.aggregate(pipeline).to_list(limit)
+    # Atlas reports cosine scores rescaled to (1 + cosine) / 2
+    return [(r['id'], 2 * r['score'] - 1) for r in results]
+
+async def find_similar_nodes(embedding: List[float], k: int) -> List[Tuple[str, float]]:
+    """Return the k nodes most similar to the embedding as (id, similarity), best first."""
+    if VECTOR_SEARCH_INDEX:
+        return await vector_search(embedding, k)
+    return await search_embedding_index(embedding, k)
+
+async def find_connected_nodes(embedding: List[float], threshold: float) -> List[Tuple[str, float]]:
+    """Return nodes with similarity >= threshold as (id, similarity)."""
+    if VECTOR_SEARCH_INDEX:
+        results = await vector_search(embedding, VECTOR_SEARCH_MATCH_LIMIT)
+        return [(node_id, similarity) for node_id, similarity in results if similarity >= threshold]
+    return await match_embedding_index(embedding, threshold)
 
 # ================================
 # API Routes
@@ -145,7 +476,15 @@ async def create_node(node_input: KnowledgeNodeCreate):
     try:
         # Generate embedding for the content
         logger.info(f"Creating node: {node_input.title}")
-        embedding = generate_embedding(node_input.content)
+        embedding = await generate_embedding(node_input.content)
+        
+        # Quantize up front so the response and later reads return the same stored vector,
+        # and the index row matches what load_embedding_index rebuilds after a restart
+        stored_embedding, embedding_scale = encode_embedding(embedding)
+        dequantized = decode_embedding(stored_embedding, embedding_scale)
+        norm = np.linalg.norm(dequantized)
+        embedding = dequantized.tolist()
+        index_embedding = (dequantized / norm if norm > 0 else dequantized).tolist()
         
         # Create the node
         node = KnowledgeNode(
@@ -157,32 +496,52 @@ async def create_node(node_input: KnowledgeNodeCreate):
             embedding=embedding
         )
         
-        # Save to database
-        await db.knowledge_nodes.insert_one(node.dict())
+        if VECTOR_SEARCH_INDEX:
+            matches = dict(await find_connected_nodes(index_embedding, SIMILARITY_THRESHOLD))
+        else:
+            # Match and join the in-process index in one step so concurrent creates see each other
+            async with _EMB_LOCK:
+                matches = dict(await match_embedding_index(index_embedding, SIMILARITY_THRESHOLD))
+                add_to_embedding_index(node.id, index_embedding)
+        
+        # Save to database while fetching the matched nodes
+        node_doc = node.dict()
+        node_doc['embedding'], node_doc['embeddingScale'] = stored_embedding, embedding_scale
+        inserted, existing_nodes = await asyncio.gather(
+            db.knowledge_nodes.insert_one(node_doc),
+            db.knowledge_nodes.find({"id": {"$in": list(matches)}}, NODE_PREVIEW_PROJECTION).to_list(None),
+            return_exceptions=True
+        )
+        if isinstance(inserted, Exception):
+            # Only a rejected write is known not to have landed; after a network
+            # error the document may exist, so its index row stays
+            if isinstance(inserted, WriteError) and not VECTOR_SEARCH_INDEX:
+                async with _EMB_LOCK:
+                    remove_from_embedding_index(node.id)
+            raise inserted
+        if isinstance(existing_nodes, Exception):
+            raise existing_nodes
         logger.info(f"Node created with ID: {node.id}")
         
-        # Find similar nodes and create connections
-        connected_nodes = []
-        existing_nodes = await db.knowledge_nodes.find({"id": {"$ne": node.id}}).to_list(1000)
+        # Create connections to similar nodes in a single round trip. A match
+        # indexed by a concurrent create may not be readable yet, so connections
+        # come from the matches and only the response needs the documents.
+        connections = [
+            Connection(fromNodeId=node.id, toNodeId=other_id, similarityScore=similarity)
+            for other_id, similarity in matches.items()
+        ]
+        connected_nodes = [
+            ConnectedNode(
+                node=hydrate(KnowledgeNodePreview, existing_node),
+                similarityScore=matches[existing_node['id']]
+            )
+            for existing_node in existing_nodes
+        ]
         
-        for existing_node in existing_nodes:
-            if existing_node.get('embedding'):
-                similarity = cosine_similarity(embedding, existing_node['embedding'])
-                
-                if similarity >= SIMILARITY_THRESHOLD:
-                    # Create connection
-                    connection = Connection(
-                        fromNodeId=node.id,
-                        toNodeId=existing_node['id'],
-                        similarityScore=similarity
-                    )
-                    await db.connections.insert_one(connection.dict())
-                    logger.info(f"Connection created: {node.id} -> {existing_node['id']} (similarity: {similarity:.3f})")
-                    
-                    connected_nodes.append(ConnectedNode(
-                        node=KnowledgeNode(**existing_node),
-                        similarityScore=similarity
-                    ))
+        if connections:
+            await db.connections.insert_many([c.dict() for c in connections])
+            for connection in connections:
+                logger.info(f"Connection created: {node.id} -> {connection.toNodeId} (similarity: {connection.similarityScore:.3f})")
         
         return NodeWithConnections(node=node, connections=connected_nodes)
     
@@ -197,40 +556,55 @@ async def create_node(node_input: KnowledgeNodeCreate):
 async def get_all_nodes():
     """Get all knowledge nodes."""
     nodes = await db.knowledge_nodes.find().to_list(1000)
-    return [KnowledgeNode(**node) for node in nodes]
+    return [hydrate_node(node) for node in nodes]
 
 # Get a single node with its connections
 @api_router.get("/nodes/{node_id}", response_model=NodeWithConnections)
 async def get_node(node_id: str):
     """Get a single node with its connections."""
-    node = await db.knowledge_nodes.find_one({"id": node_id})
-    if not node:
+    # Join the node's strongest connections (either direction) and the node at
+    # the other end of each server-side, so the whole view is one round trip.
+    # node_id is inlined in the connections sub-pipeline so its $or can use the
+    # fromNodeId/toNodeId indexes, and the $limit keeps the result bounded
+    # however many connections the node has.
+    pipeline = [
+        {"$match": {"id": node_id}},
+        {"$limit": 1},
+        {"$lookup": {
+            "from": "connections",
+            "pipeline": [
+                {"$match": {"$or": [{"fromNodeId": node_id}, {"toNodeId": node_id}]}},
+                {"$sort": {"similarityScore": -1}},
+                {"$limit": 100},
+                {"$lookup": {
+                    "from": "knowledge_nodes",
+                    "let": {"otherId": {"$cond": [{"$eq": ["$fromNodeId", node_id]}, "$toNodeId", "$fromNodeId"]}},
+                    "pipeline": [
+                        {"$match": {"$expr": {"$eq": ["$id", "$$otherId"]}}},
+                        {"$project": NODE_PREVIEW_PROJECTION}
+                    ],
+                    "as": "other"
+                }}
+            ],
+            "as": "connections"
+        }}
+    ]
+    results = await db.knowledge_nodes.aggregate(pipeline).to_list(1)
+    if not results:
         raise HTTPException(status_code=404, detail="Node not found")
+    node = results[0]
     
-    # Get all connections for this node
-    connections = await db.connections.find({
-        "$or": [
-            {"fromNodeId": node_id},
-            {"toNodeId": node_id}
-        ]
-    }).to_list(100)
-    
-    connected_nodes = []
-    for conn in connections:
-        # Get the other node in the connection
-        other_id = conn['toNodeId'] if conn['fromNodeId'] == node_id else conn['fromNodeId']
-        other_node = await db.knowledge_nodes.find_one({"id": other_id})
-        if other_node:
-            connected_nodes.append(ConnectedNode(
-                node=KnowledgeNode(**other_node),
-                similarityScore=conn['similarityScore']
-            ))
-    
-    # Sort by similarity score
-    connected_nodes.sort(key=lambda x: x.similarityScore, reverse=True)
+    connected_nodes = [
+        ConnectedNode(
+            node=hydrate(KnowledgeNodePreview, conn['other'][0]),
+            similarityScore=conn['similarityScore']
+        )
+        for conn in node['connections']
+        if conn['other']
+    ]
     
     return NodeWithConnections(
-        node=KnowledgeNode(**node),
+        node=hydrate_node(node),
         connections=connected_nodes
     )
 
@@ -239,12 +613,15 @@ async def get_node(node_id: str):
 async def delete_node(node_id: str):
     """Delete a knowledge node and its connections."""
     # Check if node exists
-    node = await db.knowledge_nodes.find_one({"id": node_id})
+    node = await db.knowledge_nodes.find_one({"id": node_id}, {"_id": 1})
     if not node:
         raise HTTPException(status_code=404, detail="Node not found")
     
     # Delete the node
     await db.knowledge_nodes.delete_one({"id": node_id})
+    if not VECTOR_SEARCH_INDEX:
+        async with _EMB_LOCK:
+            remove_from_embedding_index(node_id)
     
     # Delete all connections involving this node
     await db.connections.delete_many({
@@ -262,24 +639,17 @@ async def semantic_search(search_input: SearchRequest):
     """Search nodes using semantic similarity."""
     try:
         # Generate embedding for the query
-        query_embedding = generate_embedding(search_input.query)
+        query_embedding = await generate_query_embedding(search_input.query)
         
-        # Get all nodes
-        nodes = await db.knowledge_nodes.find().to_list(1000)
+        # Rank indexed nodes and fetch only the top 10 documents
+        top = await find_similar_nodes(query_embedding, 10)
+        nodes = {n['id']: n async for n in db.knowledge_nodes.find({"id": {"$in": [node_id for node_id, _ in top]}})}
         
-        # Calculate similarity for each node
-        results = []
-        for node in nodes:
-            if node.get('embedding'):
-                similarity = cosine_similarity(query_embedding, node['embedding'])
-                results.append({
-                    'node': KnowledgeNode(**node),
-                    'similarity': similarity
-                })
-        
-        # Sort by similarity and return top 10
-        results.sort(key=lambda x: x['similarity'], reverse=True)
-        return [SearchResult(**r) for r in results[:10]]
+        return [
+            SearchResult.model_construct(node=hydrate_node(nodes[node_id]), similarity=similarity)
+            for node_id, similarity in top
+            if node_id in nodes
+        ]
     
     except HTTPException:
         raise
@@ -291,12 +661,12 @@ async def semantic_search(search_input: SearchRequest):
 @api_router.get("/graph", response_model=GraphData)
 async def get_graph():
     """Get all nodes and connections for graph visualization."""
-    nodes = await db.knowledge_nodes.find().to_list(1000)
+    nodes = await db.knowledge_nodes.find({}, NODE_SUMMARY_PROJECTION).to_list(1000)
     connections = await db.connections.find().to_list(5000)
     
     return GraphData(
-        nodes=[KnowledgeNode(**node) for node in nodes],
-        connections=[Connection(**conn) for conn in connections]
+        nodes=[hydrate(KnowledgeNodeSummary, node) for node in nodes],
+        connections=[hydrate(Connection, conn) for conn in connections]
     )
 
 # Include the router in the main app
@@ -310,6 +680,42 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.on_event("startup")
+async def startup_embedding_cache():
+    global embedding_cache
+    embedding_cache = sqlite3.connect(EMBEDDING_CACHE_PATH, check_same_thread=False)
+    embedding_cache.execute("CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)")
+
+@app.on_event("startup")
+async def startup_embedding_model():
+    # Load the model in a worker thread so the first request doesn't pay for it
+    await asyncio.to_thread(get_embedding_model)
+
+@app.on_event("startup")
+async def startup_db_indexes():
+    # Every lookup is by node id; connections are matched on either endpoint.
+    # The compound index also serves the fromNodeId branch of the $or queries.
+    await db.knowledge_nodes.create_index("id", unique=True)
+    await db.connections.create_index([("fromNodeId", 1), ("toNodeId", 1)], unique=True)
+    await db.connections.create_index("toNodeId")
+
+@app.on_event("startup")
+async def startup_embedding_index():
+    await load_embedding_index()
+    if numba is not None and not faiss and not VECTOR_SEARCH_INDEX:
+        # Compile (or load from cache) the scoring kernel now rather than on the first search
+        await asyncio.to_thread(
+            _score_rows,
+            np.zeros((1, EMBEDDING_DIM), np.float32),
+            np.zeros(EMBEDDING_DIM, np.float32),
+            np.empty(1, np.float32)
+        )
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    global embedding_cache
+    logger.info(f"Query embedding cache: {_cached_query_embedding.cache_info()}")
     client.close()
+    with embedding_cache_lock:
+        embedding_cache.close()
+        embedding_cache = None
@@ -38,7 +38,6 @@ interface KnowledgeNode {
   id: string;
   type: string;
   title: string;
-  content: string;
 }
 
 interface Connection {
@@ -0,0 +1,36 @@
+import os
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# server.py lives in backend/ and reads its MongoDB settings at import time;
+# the client connects lazily, so placeholder values are enough for unit tests.
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'backend'))
+os.environ.setdefault('MONGO_URL', 'mongodb://localhost:27017')
+os.environ.setdefault('DB_NAME', 'syntra_test')
+
+
+class FakeEmbeddingModel:
+    """Stands in for SentenceTransformer: one-hot unit vectors, recording every batch."""
+
+    def __init__(self, dim):
+        self.dim = dim
+        self.calls = []
+
+    def encode(self, texts, convert_to_numpy=True, normalize_embeddings=True):
+        self.calls.append(list(texts))
+        rows = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in zip(rows, texts):
+            row[sum(text.encode()) % self.dim] = 1.0
+        return rows
+
+
+@pytest.fixture
+def fake_model(monkeypatch):
+    import server
+
+    model = FakeEmbeddingModel(server.EMBEDDING_DIM)
+    monkeypatch.setattr(server, 'get_embedding_model', lambda: model)
+    return model
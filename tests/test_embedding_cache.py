@@ -0,0 +1,100 @@
+import asyncio
+from unittest import mock
+
+import numpy as np
+import pytest
+
+import server
+
+
+def vector(i):
+    return np.full(server.EMBEDDING_DIM, i, dtype=np.float32)
+
+
+def cached_keys():
+    return {key for key, in server.embedding_cache.execute("SELECT key FROM embeddings")}
+
+
+@pytest.fixture
+def cache_path(tmp_path, monkeypatch):
+    """Point the on-disk cache at a fresh file, with the Mongo client stubbed for shutdown."""
+    path = tmp_path / 'embedding_cache.sqlite3'
+    monkeypatch.setattr(server, 'EMBEDDING_CACHE_PATH', path)
+    monkeypatch.setattr(server, 'embedding_cache', None)
+    monkeypatch.setattr(server, 'client', mock.Mock())
+    return path
+
+
+@pytest.fixture
+def open_cache(cache_path):
+    asyncio.run(server.startup_embedding_cache())
+    yield server.embedding_cache
+    asyncio.run(server.shutdown_db_client())
+
+
+def test_write_evicts_oldest_entries(open_cache, monkeypatch):
+    monkeypatch.setattr(server, 'EMBEDDING_CACHE_MAX_ENTRIES', 3)
+
+    for key in ['a', 'b', 'c', 'd', 'e']:
+        server._write_embedding_cache({key: vector(1)})
+
+    assert cached_keys() == {'c', 'd', 'e'}
+
+
+def test_write_evicts_within_a_single_batch(open_cache, monkeypatch):
+    monkeypatch.setattr(server, 'EMBEDDING_CACHE_MAX_ENTRIES', 3)
+
+    server._write_embedding_cache({key: vector(1) for key in ['a', 'b', 'c', 'd', 'e']})
+
+    assert cached_keys() == {'c', 'd', 'e'}
+
+
+def test_rewritten_entry_counts_as_newest(open_cache, monkeypatch):
+    monkeypatch.setattr(server, 'EMBEDDING_CACHE_MAX_ENTRIES', 3)
+
+    server._write_embedding_cache({key: vector(1) for key in ['a', 'b', 'c']})
+    server._write_embedding_cache({'a': vector(2)})
+    server._write_embedding_cache({'d': vector(1)})
+
+    assert cached_keys() == {'a', 'c', 'd'}
+    np.testing.assert_array_equal(server._read_embedding_cache(['a'])['a'], vector(2))
+
+
+def test_read_spans_several_chunks(open_cache):
+    count = 2 * server.EMBEDDING_CACHE_QUERY_CHUNK + 1
+    server._write_embedding_cache({f'key{i}': vector(i) for i in range(count)})
+
+    keys = [f'key{i}' for i in range(count)] + ['missing']
+    vectors = server._read_embedding_cache(keys)
+
+    assert len(vectors) == count
+    for i in [0, server.EMBEDDING_CACHE_QUERY_CHUNK, count - 1]:
+        np.testing.assert_array_equal(vectors[f'key{i}'], vector(i))
+
+
+def test_generate_without_persist_writes_nothing(open_cache, fake_model):
+    first = server._generate_embeddings_batch(['query text'], persist=False)
+
+    assert cached_keys() == set()
+
+    server._generate_embeddings_batch(['node text'])
+    second = server._generate_embeddings_batch(['query text', 'node text'], persist=False)
+
+    assert second[0] == first[0]
+    assert fake_model.calls == [['query text'], ['node text'], ['query text']]
+    assert len(cached_keys()) == 1
+
+
+def test_cache_reopens_after_shutdown(cache_path):
+    asyncio.run(server.startup_embedding_cache())
+    server._write_embedding_cache({'a': vector(1)})
+    asyncio.run(server.shutdown_db_client())
+    assert server.embedding_cache is None
+
+    asyncio.run(server.startup_embedding_cache())
+    try:
+        np.testing.assert_array_equal(server._read_embedding_cache(['a'])['a'], vector(1))
+        server._write_embedding_cache({'b': vector(2)})
+        assert cached_keys() == {'a', 'b'}
+    finally:
+        asyncio.run(server.shutdown_db_client())
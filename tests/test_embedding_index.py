@@ -0,0 +1,69 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+import server
+
+
+def unit_vector(i):
+    vec = np.zeros(server.EMBEDDING_DIM, dtype=np.float32)
+    vec[i] = 1.0
+    return vec
+
+
+def indexed_rows():
+    if server._EMB_INDEX is not None:
+        return server._EMB_INDEX.reconstruct_n(0, server._EMB_INDEX.ntotal)
+    return server._EMB_MATRIX
+
+
+@pytest.fixture(params=['numpy', 'faiss'])
+def empty_index(request, monkeypatch):
+    """Swap in an empty in-process index on the requested backend."""
+    if request.param == 'faiss':
+        faiss = pytest.importorskip('faiss')
+        monkeypatch.setattr(server, 'faiss', faiss)
+        monkeypatch.setattr(server, '_EMB_INDEX', faiss.IndexFlatIP(server.EMBEDDING_DIM))
+    else:
+        monkeypatch.setattr(server, 'faiss', None)
+        monkeypatch.setattr(server, '_EMB_INDEX', None)
+    monkeypatch.setattr(server, 'VECTOR_SEARCH_INDEX', None)
+    monkeypatch.setattr(server, '_EMB_MATRIX', np.empty((0, server.EMBEDDING_DIM), dtype=np.float32))
+    monkeypatch.setattr(server, '_EMB_IDS', [])
+
+
+def test_remove_keeps_rows_aligned_with_ids(empty_index):
+    for i, node_id in enumerate(['a', 'b', 'c', 'd']):
+        server.add_to_embedding_index(node_id, unit_vector(i).tolist())
+
+    server.remove_from_embedding_index('b')
+
+    assert server._EMB_IDS == ['a', 'c', 'd']
+    rows = indexed_rows()
+    assert rows.shape == (3, server.EMBEDDING_DIM)
+    for row, i in zip(rows, [0, 2, 3]):
+        assert np.array_equal(row, unit_vector(i))
+
+
+def test_search_after_remove_returns_matching_ids(empty_index):
+    for i, node_id in enumerate(['a', 'b', 'c', 'd']):
+        server.add_to_embedding_index(node_id, unit_vector(i).tolist())
+
+    server.remove_from_embedding_index('a')
+    server.remove_from_embedding_index('c')
+
+    for i, node_id in [(1, 'b'), (3, 'd')]:
+        top = asyncio.run(server.search_embedding_index(unit_vector(i).tolist(), 1))
+        assert top == [(node_id, pytest.approx(1.0))]
+        matches = asyncio.run(server.match_embedding_index(unit_vector(i).tolist(), server.SIMILARITY_THRESHOLD))
+        assert matches == [(node_id, pytest.approx(1.0))]
+
+
+def test_remove_unknown_id_is_a_no_op(empty_index):
+    server.add_to_embedding_index('a', unit_vector(0).tolist())
+
+    server.remove_from_embedding_index('missing')
+
+    assert server._EMB_IDS == ['a']
+    assert indexed_rows().shape == (1, server.EMBEDDING_DIM)
@@ -0,0 +1,86 @@
+import numpy as np
+import pytest
+from bson import BSON, Binary
+
+import server
+
+
+def roundtrip(value):
+    """Pass a value through BSON encoding, as MongoDB storage would."""
+    return BSON.encode({'v': value}).decode()['v']
+
+
+def test_encode_embedding_writes_int8_vector_header_and_scale():
+    embedding = [0.5, -1.0, 0.25, 0.0]
+    stored, scale = server.encode_embedding(embedding)
+
+    assert isinstance(stored, Binary)
+    assert stored.subtype == server.BSON_VECTOR_SUBTYPE
+    assert stored[0] == server.BSON_VECTOR_INT8
+    assert stored[1] == 0
+    assert len(stored) == 2 + len(embedding)
+    assert scale == pytest.approx(1.0 / 127)
+    assert list(np.frombuffer(stored, dtype=np.int8, offset=2)) == [64, -127, 32, 0]
+
+
+def test_int8_embedding_roundtrips_through_bson():
+    rng = np.random.default_rng(0)
+    embedding = rng.standard_normal(server.EMBEDDING_DIM).astype(np.float32)
+    embedding /= np.linalg.norm(embedding)
+
+    stored, scale = server.encode_embedding(embedding.tolist())
+    decoded = server.decode_embedding(roundtrip(stored), scale)
+
+    assert decoded.dtype == np.float32
+    assert decoded.shape == embedding.shape
+    assert np.abs(decoded - embedding).max() <= scale / 2 + 1e-7
+    assert float(decoded @ embedding / np.linalg.norm(decoded)) > 0.999
+
+
+def test_decode_embedding_reads_legacy_float32_vector():
+    embedding = np.array([1.5, -2.0, 3.25], dtype='<f4')
+    stored = Binary(bytes([server.BSON_VECTOR_FLOAT32, 0]) + embedding.tobytes(), server.BSON_VECTOR_SUBTYPE)
+
+    decoded = server.decode_embedding(roundtrip(stored))
+
+    assert decoded.tolist() == [1.5, -2.0, 3.25]
+
+
+def test_decode_embedding_reads_legacy_list():
+    decoded = server.decode_embedding([0.1, 0.2, 0.3])
+
+    assert decoded.dtype == np.float32
+    assert np.allclose(decoded, [0.1, 0.2, 0.3])
+
+
+def test_empty_embeddings():
+    stored, scale = server.encode_embedding([])
+
+    assert scale == 1.0
+    assert server.decode_embedding(roundtrip(stored), scale).size == 0
+    assert server.decode_embedding([]).size == 0
+    assert server.decode_embedding(None).size == 0
+
+
+def node_fields(**fields):
+    return {'type': 'note', 'title': 'Title', 'content': 'Body', **fields}
+
+
+def test_knowledge_node_decodes_stored_embedding():
+    stored, scale = server.encode_embedding([0.5, -1.0])
+
+    node = server.KnowledgeNode(**node_fields(embedding=roundtrip(stored), embeddingScale=scale))
+
+    assert node.embedding == pytest.approx([0.5, -1.0], abs=scale)
+
+
+def test_knowledge_node_keeps_decoded_embedding(monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError("list embeddings must not be decoded again")
+
+    monkeypatch.setattr(server, 'decode_embedding', fail)
+
+    node = server.KnowledgeNode(**node_fields(embedding=[0.25, 0.5], embeddingScale=0.1))
+
+    assert node.embedding == [0.25, 0.5]
+    assert server.KnowledgeNode.model_validate(node.model_dump()).embedding == [0.25, 0.5]
@@ -0,0 +1,34 @@
+import asyncio
+
+import pytest
+
+import server
+
+
+@pytest.fixture(autouse=True)
+def empty_query_cache():
+    server._cached_query_embedding.cache_clear()
+    yield
+    server._cached_query_embedding.cache_clear()
+
+
+def test_repeated_query_hits_cache(monkeypatch):
+    calls = []
+
+    def generate(contents, persist=True):
+        calls.append((contents, persist))
+        return [[0.6, 0.8]]
+
+    monkeypatch.setattr(server, '_generate_embeddings_batch', generate)
+
+    first = asyncio.run(server.generate_query_embedding('reading habits'))
+    second = asyncio.run(server.generate_query_embedding('reading habits'))
+
+    assert first == second == [0.6, 0.8]
+    assert calls == [(['reading habits'], False)]
+    assert server._cached_query_embedding.cache_info().hits == 1
+
+
+def test_blank_query_returns_empty_embedding(fake_model):
+    assert asyncio.run(server.generate_query_embedding('   \n ')) == []
+    assert fake_model.calls == []